@@ -2,7 +2,7 @@
 """
 Copart Car Checker
 Monitors Copart UK for new car listings matching specific criteria:
-- Has V5 document (NOT Category A or B)
+- Category U only (has V5 document, NOT Category A or B)
 - Year: 2020-2027
 - Damage: Minor or None
 - Transmission: Automatic
@@ -11,60 +11,271 @@ Monitors Copart UK for new car listings matching specific criteria:
 """
 import os
 import json
+import functools
+import mmap
+import random
+import socket
+import threading
+import time
+import traceback
+import orjson
 import requests
-from typing import Optional, Set, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from dataclasses import dataclass
+from typing import Optional, Set, Dict, List, Iterator, Tuple, TypedDict, Union
 from pathlib import Path
 
-BOT_TOKEN: Optional[str] = None
-CHAT_ID: Optional[str] = None
-
-# File to store previously seen car IDs
-STATE_FILE = Path(__file__).parent / "seen_cars.json"
-
-# Copart search URL (for all vehicles)
-SEARCH_URL = "https://www.copart.co.uk/vehicles"
-
-# Search criteria - Category U only, all makes/models
-SEARCH_PARAMS = {
-    "searchCriteria": json.dumps({
-        "query": ["*"],
-        "filter": {
-            "TITL": ["sale_title_type:U"],  # Category U only
-            "YEAR": ["lot_year:[2020 TO 2027]"],
-            "V5": ["v5_document_number:*"],
-            "PRID": ["damage_type_code:DAMAGECODE_MN", "damage_type_code:DAMAGECODE_NO"],
-            "TMTP": ["transmission_type:\"Automatic\""],
-            "ODM": ["odometer_reading_received:[0 TO 80000]"]
-        },
-        "searchName": "",
-        "watchListOnly": False,
-        "freeFormSearch": False
-    })
+# Print full tracebacks for handled errors when DEBUG is set
+DEBUG = bool(os.environ.get("DEBUG"))
+
+# File to store previously seen car IDs (one lot ID per line)
+STATE_FILE = Path(__file__).parent / "seen_cars.txt"
+
+# File to store HTTP validators (ETag/Last-Modified) and the total from the last Copart response
+FETCH_STATE_FILE = Path(__file__).parent / "fetch_state.json"
+
+# Upper bound in seconds on a single Retry-After wait honoured by RETRY_POLICY
+MAX_RETRY_AFTER = 30
+
+# Upper bound in seconds on the delay between checks after repeated failures (long-running mode)
+MAX_BACKOFF = 3600
+
+# TCP keep-alive probing for pooled connections: idle seconds before the first probe,
+# seconds between probes, and unanswered probes before the connection is dropped
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+# Rewrite the state file once it holds more than this many times the current listing count
+COMPACT_FACTOR = 2
+
+# Telegram Bot API base URL
+TELEGRAM_API = "https://api.telegram.org"
+
+# Copart public lots search-results API endpoint
+COPART_API_URL = "https://www.copart.co.uk/public/lots/search-results"
+
+# Lots per search-results page, and limits on fetching further pages
+PAGE_SIZE = 100
+MAX_PAGES = 10
+MAX_PAGE_WORKERS = 5
+
+# Copart-specific request headers (browser identity headers live on SESSION)
+_COPART_HEADERS = {
+    "Host": "www.copart.co.uk",
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+    "Content-Type": "application/json",
+    "X-Requested-With": "XMLHttpRequest",
+    "Referer": "https://www.copart.co.uk/lotSearchResults",
+    "Cache-Control": "max-age=0"
+}
+
+# Search payload - exact format from Copart (Category U only, all makes/models)
+_COPART_PAYLOAD = {
+    "query": ["*"],
+    "filter": {
+        "TITL": ["sale_title_type:U"],  # Category U only
+        "YEAR": ["lot_year:[2020 TO 2027]"],
+        "PRID": [
+            "damage_type_code:DAMAGECODE_MN",
+            "damage_type_code:DAMAGECODE_NO"
+        ],
+        "TMTP": ['transmission_type:"Automatic"'],
+        "V5": ["v5_document_number:* AND -sale_title_type:B AND -sale_title_type:A"],
+        "ODM": ["odometer_reading_received:[0 TO 80000]"]
+    },
+    "sort": [
+        "lot_year desc",  # Sort by year (newest first)
+        "auction_date_utc asc"
+    ],
+    "page": 0,
+    "size": PAGE_SIZE,
+    "start": 0,
+    "watchListOnly": False,
+    "freeFormSearch": False,
+    "hideImages": True,  # Image URLs are never used, so ask Copart not to send them
+    "defaultSort": True,
+    "specificRowProvided": False,
+    "displayName": "",
+    "searchName": "",
+    "backUrl": "",
+    "includeTagByField": {},
+    "rawParams": {}
 }
 
+# Payload is static, so serialize it once at import rather than on every fetch
+_COPART_BODY = orjson.dumps(_COPART_PAYLOAD)
+
+# Telegram counts message length in UTF-16 code units (4096 max); keep a small safety margin
+TELEGRAM_MESSAGE_LIMIT = 4096 - 16
+
+# Notification message templates
+_DIVIDER = "\n" + "=" * 40 + "\n"
+_LOT_LINK = "   🔗 https://www.copart.co.uk/lot/{}/{}\n".format
+_LOT_LINK_SHORT = "   🔗 https://www.copart.co.uk/lot/{}\n".format
+_NOTIFICATION_HEADER = (
+    "🚗 New Copart Alert!\n\n"
+    "{count} new car(s) matching your criteria:\n"
+    + _DIVIDER
+)
+_NOTIFICATION_CONTINUED = "🚗 Continued ({index}/{count})...\n\n"
+_NOTIFICATION_FOOTER = (
+    "\nTotal listings: {total}\n"
+    "\n📋 Search Criteria:\n"
+    "• Category U, has V5 (NOT Cat A or B)\n"
+    "• Year: 2020-2027\n"
+    "• Transmission: Automatic\n"
+    "• Mileage: 0-80,000 miles\n"
+    "• Damage: Minor or None\n"
+)
+
+# Hash of the last parsed Copart response body, so a long-running process can skip
+# re-parsing an identical body
+_LAST_RESPONSE = {"digest": None, "total": 0}
+
+
+class Lot(TypedDict, total=False):
+    """Raw lot record from the Copart search-results API (only the fields we read)"""
+    ln: Union[int, str]  # Lot number
+    ldu: str  # Lot detail URL slug
+    lcy: int  # Lot year
+    mkn: str  # Make name
+    lm: str  # Lot model
+    ld: str  # Lot description
+    dd: str  # Damage description
+    orr: int  # Odometer reading
+    tmtp: str  # Transmission type
+    egn: str  # Engine
+    ft: str  # Fuel type
+    ts: str  # Title status
+    hb: float  # High bid
+    ad: int  # Auction date
+    yn: str  # Yard name
+
+
+class CarDetails(TypedDict):
+    """Car details used in notifications, extracted from a Lot"""
+    lot_id: int
+    lot_url: str
+    year: Optional[int]
+    make: Optional[str]
+    model: Optional[str]
+    description: Optional[str]
+    damage: Optional[str]
+    odometer: Optional[int]
+    transmission: Optional[str]
+    engine: Optional[str]
+    fuel_type: Optional[str]
+    sale_title: Optional[str]
+    current_bid: Optional[float]
+    auction_date: Optional[int]
+    location: Optional[str]
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets disable Nagle and enable TCP keep-alive
+
+    urllib3's default socket options already set TCP_NODELAY; they are kept
+    explicitly so passing custom options does not drop them. Probing starts after
+    KEEPALIVE_IDLE seconds instead of the kernel default of two hours, so a pooled
+    connection silently dropped by a peer or NAT is detected within about a minute.
+    This does not stop servers closing idle keep-alive connections themselves.
+    """
 
-def startup():
-    """Load environment variables"""
-    global BOT_TOKEN, CHAT_ID
-    BOT_TOKEN = os.environ.get("BOT_TOKEN")
-    CHAT_ID = os.environ.get("CHAT_ID")
-    if not BOT_TOKEN or not CHAT_ID:
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ] + [
+        # Not every platform exposes these (macOS has no TCP_KEEPIDLE)
+        (socket.IPPROTO_TCP, getattr(socket, name), value)
+        for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE), ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL), ("TCP_KEEPCNT", KEEPALIVE_COUNT))
+        if hasattr(socket, name)
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+class CappedRetry(Retry):
+    """Retry that honours Retry-After but never sleeps longer than MAX_RETRY_AFTER"""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+# Retry transient failures in-process on the pooled connection, honouring (capped)
+# Retry-After. This is the only place 429s are handled. POST is included because both
+# the Copart search and Telegram sendMessage are safe to repeat (at worst a duplicate
+# alert). Final responses are returned rather than raised so callers still see the
+# status code.
+RETRY_POLICY = CappedRetry(
+    total=5,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Shared HTTP session so Copart and Telegram requests reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount("https://", KeepAliveAdapter(
+    pool_connections=2,  # One pool per host: Copart and Telegram
+    pool_maxsize=10,
+    max_retries=RETRY_POLICY,
+))
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept-Language": "en-GB,en;q=0.9",
+    # "br" is only decoded by urllib3 when the brotli package is installed (see requirements.txt)
+    "Accept-Encoding": "gzip, deflate, br",
+})
+
+
+@dataclass(frozen=True)
+class TelegramConfig:
+    """Telegram bot settings read from the environment"""
+    bot_token: str
+    chat_id: str
+    send_message_url: str
+
+
+@functools.cache
+def telegram_config() -> TelegramConfig:
+    """Load Telegram settings from environment variables (read once per process)"""
+    bot_token = os.environ.get("BOT_TOKEN")
+    chat_id = os.environ.get("CHAT_ID")
+    if not bot_token or not chat_id:
         raise ValueError("BOT_TOKEN and CHAT_ID environment variables must be set.")
+    return TelegramConfig(bot_token, chat_id, f"{TELEGRAM_API}/bot{bot_token}/sendMessage")
 
 
 def notify(msg: str):
     """Send Telegram notification"""
-    startup()
+    config = telegram_config()
+    payload = {"chat_id": config.chat_id, "text": msg}
 
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     response = None
     try:
-        response = requests.post(url, json={"chat_id": CHAT_ID, "text": msg}, timeout=10)
+        response = SESSION.post(config.send_message_url, json=payload, timeout=10)
+        if response.status_code in RETRY_POLICY.status_forcelist:
+            # RETRY_POLICY returns the last response instead of raising once retries run out
+            print(f"Telegram still returned HTTP {response.status_code} after {RETRY_POLICY.total} retries")
         response.raise_for_status()
         data = response.json()
         if not data.get("ok"):
             raise RuntimeError(f"Telegram API error: {data}")
         print("✓ Notification sent successfully")
+    except requests.exceptions.ConnectionError as e:
+        print("Could not reach Telegram after retries:", e)
+        raise
     except Exception as e:
         print("Failed to send Telegram message:", e)
         if response is not None:
@@ -73,100 +284,229 @@ def notify(msg: str):
         raise
 
 
-def load_seen_cars() -> Set[str]:
-    """Load previously seen car IDs from state file"""
-    if STATE_FILE.exists():
-        try:
-            with open(STATE_FILE, 'r') as f:
-                data = json.load(f)
-                return set(data.get("car_ids", []))
-        except Exception as e:
-            print(f"Warning: Could not load state file: {e}")
-            return set()
-    return set()
+def warm_up_telegram():
+    """Open a pooled connection to Telegram so a later notify() skips DNS and TLS setup
+
+    Best effort: one short attempt on the same connection pool notify() uses, bypassing
+    RETRY_POLICY so an unreachable Telegram cannot hold anything up.
+    """
+    try:
+        request = SESSION.prepare_request(requests.Request("HEAD", TELEGRAM_API))
+        # Resolve proxies and CA bundle from the environment as Session.request does,
+        # otherwise HTTPS_PROXY or REQUESTS_CA_BUNDLE would select a different pool
+        settings = SESSION.merge_environment_settings(request.url, {}, None, None, None)
+        adapter = SESSION.get_adapter(TELEGRAM_API)
+        pool = adapter.get_connection_with_tls_context(
+            request, verify=settings["verify"], proxies=settings["proxies"], cert=settings["cert"]
+        )
+        pool.urlopen("HEAD", "/", retries=False, timeout=2)
+    except Exception as e:
+        print(f"Telegram warm-up failed (ignored): {e}")
+
+
+def iter_seen_cars() -> Iterator[int]:
+    """Yield previously seen car IDs from state file
+
+    The file is memory-mapped and read line by line, so it is never copied
+    into a single Python buffer.
+    """
+    if not STATE_FILE.exists():
+        return
+    try:
+        with open(STATE_FILE, 'rb') as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b""):
+                    try:
+                        yield int(line)
+                    except ValueError:
+                        # Blank or corrupt line; skip it rather than dropping the rest of the file
+                        continue
+    except Exception as e:
+        print(f"Warning: Could not load state file: {e}")
+
+
+def find_new_cars(current_cars: Set[int]) -> Tuple[Set[int], int]:
+    """Diff current cars against the state file without loading it into a set
+
+    Memory stays proportional to the current listing, however large the state
+    file grows. Returns (new car IDs, number of IDs in the state file).
+    """
+    new_cars = set(current_cars)
+    seen_count = 0
+    for car_id in iter_seen_cars():
+        new_cars.discard(car_id)
+        seen_count += 1
+    return new_cars, seen_count
+
+
+def write_file_atomic(path: Path, data: bytes):
+    """Write data to path via a temp file and rename, so a crash never leaves it truncated"""
+    tmp = path.with_suffix(f"{path.suffix}.tmp.{os.getpid()}")
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
 
 
-def save_seen_cars(car_ids: Set[str]):
+def save_seen_cars(car_ids: Set[int]):
     """Save seen car IDs to state file"""
     try:
-        with open(STATE_FILE, 'w') as f:
-            json.dump({"car_ids": list(car_ids)}, f, indent=2)
+        write_file_atomic(STATE_FILE, "".join(f"{car_id}\n" for car_id in sorted(car_ids)).encode())
     except Exception as e:
         print(f"Warning: Could not save state file: {e}")
 
 
+def append_seen_cars(car_ids: Set[int]):
+    """Append newly seen car IDs to the state file"""
+    if not car_ids:
+        return
+    lines = "".join(f"{car_id}\n" for car_id in sorted(car_ids)).encode()
+    try:
+        with open(STATE_FILE, 'ab+') as f:
+            # A torn earlier append or a hand edit can leave the last line unterminated;
+            # start on a new line so the first ID is not glued onto it
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = b"\n" + lines
+            f.write(lines)
+    except Exception as e:
+        print(f"Warning: Could not update state file: {e}")
+
+
+def compact_seen_cars(seen_count: int, current_cars: Set[int]) -> bool:
+    """Rewrite the state file with only the current cars once the log has grown too large
+
+    Returns True if the file was compacted
+    """
+    if seen_count <= COMPACT_FACTOR * len(current_cars):
+        return False
+    save_seen_cars(current_cars)
+    return True
+
+
+def load_fetch_state() -> Dict:
+    """Load HTTP validators saved from the last Copart response"""
+    if FETCH_STATE_FILE.exists():
+        try:
+            return orjson.loads(FETCH_STATE_FILE.read_bytes())
+        except Exception as e:
+            print(f"Warning: Could not load fetch state file: {e}")
+    return {}
+
+
+def save_fetch_state(state: Dict):
+    """Save HTTP validators from the latest Copart response"""
+    try:
+        write_file_atomic(FETCH_STATE_FILE, orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    except Exception as e:
+        print(f"Warning: Could not save fetch state file: {e}")
+
+
+def fetch_copart_page(page: int) -> List[Lot]:
+    """Fetch the lots on one further page of Copart search results
+
+    Raises on any failure so a partial result set is never treated as complete.
+    """
+    body = orjson.dumps({**_COPART_PAYLOAD, "page": page, "start": page * PAGE_SIZE})
+    response = SESSION.post(COPART_API_URL, data=body, headers=_COPART_HEADERS, timeout=20)
+    if response.status_code != 200:
+        raise RuntimeError(f"Copart page {page} failed with HTTP {response.status_code}: {response.text[:500]}")
+    try:
+        return get_lots(orjson.loads(response.content))
+    except orjson.JSONDecodeError as e:
+        # Re-raise as a non-JSON error so it is not reported against the first page's response
+        raise RuntimeError(f"Copart page {page} is not valid JSON: {response.text[:500]}") from e
+
+
 def fetch_copart_cars() -> Dict:
     """
     Fetch current car listings from Copart
 
-    Uses the actual Copart public lots search-results API endpoint
+    Uses the actual Copart public lots search-results API endpoint.
+    Sends If-None-Match/If-Modified-Since when validators were saved, and
+    returns a response marked "not_modified" (carrying the cached total) if
+    Copart answers 304 or the body is identical to the last one parsed by
+    this process.
     """
-    api_url = "https://www.copart.co.uk/public/lots/search-results"
-
-    headers = {
-        "Host": "www.copart.co.uk",
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "Accept-Language": "en-GB,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Content-Type": "application/json",
-        "X-Requested-With": "XMLHttpRequest",
-        "Connection": "keep-alive",
-        "Referer": "https://www.copart.co.uk/lotSearchResults",
-        "Cache-Control": "max-age=0"
-    }
-
-    # Build search payload - exact format from Copart
-    payload = {
-        "query": ["*"],
-        "filter": {
-            "YEAR": ["lot_year:[2020 TO 2027]"],
-            "PRID": [
-                "damage_type_code:DAMAGECODE_MN",
-                "damage_type_code:DAMAGECODE_NO"
-            ],
-            "TMTP": ['transmission_type:"Automatic"'],
-            "V5": ["v5_document_number:* AND -sale_title_type:B AND -sale_title_type:A"],
-            "ODM": ["odometer_reading_received:[0 TO 80000]"]
-        },
-        "sort": [
-            "lot_year desc",  # Sort by year (newest first)
-            "auction_date_utc asc"
-        ],
-        "page": 0,
-        "size": 100,  # Get up to 100 results
-        "start": 0,
-        "watchListOnly": False,
-        "freeFormSearch": False,
-        "hideImages": False,
-        "defaultSort": True,
-        "specificRowProvided": False,
-        "displayName": "",
-        "searchName": "",
-        "backUrl": "",
-        "includeTagByField": {},
-        "rawParams": {}
-    }
+    fetch_state = load_fetch_state()
+    headers = dict(_COPART_HEADERS)
+    if fetch_state.get("etag"):
+        headers["If-None-Match"] = fetch_state["etag"]
+    if fetch_state.get("last_modified"):
+        headers["If-Modified-Since"] = fetch_state["last_modified"]
 
     try:
         print(f"Attempting to fetch from Copart UK API...")
-        print(f"URL: {api_url}")
+        print(f"URL: {COPART_API_URL}")
 
-        response = requests.post(api_url, json=payload, headers=headers, timeout=20)
+        response = SESSION.post(COPART_API_URL, data=_COPART_BODY, headers=headers, timeout=20)
 
         print(f"Status: {response.status_code}")
+        if DEBUG:
+            encoding = response.headers.get("Content-Encoding", "identity")
+            print(f"Content-Encoding: {encoding} ({len(response.content)} bytes decoded)")
+
+        if response.status_code == 304:
+            print(f"✓ Copart results unchanged since last run")
+            total = fetch_state.get("total", 0)
+            return {"data": {"results": {"content": [], "totalElements": total}}, "not_modified": True}
 
         if response.status_code == 200:
+            digest = hash(response.content)
+            if digest == _LAST_RESPONSE["digest"]:
+                print(f"✓ Copart results identical to last fetch")
+                total = _LAST_RESPONSE["total"]
+                return {"data": {"results": {"content": [], "totalElements": total}}, "not_modified": True}
+
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
                 print(f"✓ Success! Got response from Copart API")
 
                 # Extract result summary
-                total = data.get("data", {}).get("results", {}).get("totalElements", 0)
+                total = data.get("data", {}).get("results", {}).get("totalElements", 0) or 0
                 print(f"Total matching cars: {total}")
 
+                # Validators and the body hash only describe the first page, so they
+                # can only short-circuit a later fetch when it was the whole result
+                single_page = total <= PAGE_SIZE
+
+                new_fetch_state = {}
+                if single_page:
+                    validators = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    new_fetch_state = {key: value for key, value in validators.items() if value}
+                    if new_fetch_state:
+                        new_fetch_state["total"] = total
+
+                # Committed by remember_fetch() only once main() has recorded the new lots
+                data["cache"] = {
+                    "digest": digest if single_page else None,
+                    "total": total,
+                    "fetch_state": new_fetch_state,
+                    "fetch_state_changed": new_fetch_state != fetch_state,
+                }
+
+                pages = min(-(-total // PAGE_SIZE), MAX_PAGES)
+                if pages > 1:
+                    print(f"Fetching {pages - 1} more page(s)...")
+                    lots = get_lots(data)
+                    with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as pool:
+                        for page_lots in pool.map(fetch_copart_page, range(1, pages)):
+                            lots.extend(page_lots)
+
                 return data
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 print(f"Response is not valid JSON")
                 print(f"Response preview: {response.text[:500]}")
                 return {"data": {"results": {"content": [], "totalElements": 0}}, "error": "Invalid JSON response"}
@@ -177,146 +517,172 @@ def fetch_copart_cars() -> Dict:
 
     except Exception as e:
         print(f"Error fetching from Copart: {e}")
-        import traceback
-        traceback.print_exc()
+        if DEBUG:
+            traceback.print_exc()
         return {"data": {"results": {"content": [], "totalElements": 0}}, "error": str(e)}
 
 
-def extract_cars(data: Dict) -> Dict[str, Dict]:
+def remember_fetch(data: Dict):
+    """Commit the validators and body hash from a fetch once its lots are recorded
+
+    Saving them any earlier would let a crash or restart turn the next fetch into
+    a "not modified" for lots that were never alerted or appended to the state.
+    """
+    cache = data.get("cache")
+    if not cache:
+        return
+    _LAST_RESPONSE["digest"] = cache["digest"]
+    _LAST_RESPONSE["total"] = cache["total"]
+    if cache["fetch_state_changed"]:
+        save_fetch_state(cache["fetch_state"])
+
+
+def get_lots(data: Dict) -> List[Lot]:
+    """Return the list of lots from a Copart search-results response"""
+    try:
+        return data["data"]["results"]["content"]
+    except (KeyError, TypeError):
+        return []
+
+
+def extract_lot_index(data: Dict) -> Dict[int, Lot]:
+    """Index the raw lots in a Copart response by lot number (ln)
+
+    Lots with a missing or non-numeric lot number are skipped.
+    """
+    lots = {}
+    for lot in get_lots(data):
+        try:
+            lots[int(lot["ln"])] = lot
+        except (KeyError, TypeError, ValueError):
+            continue
+    return lots
+
+
+def extract_car_details(lot_id: int, lot: Lot) -> CarDetails:
+    """Extract the car details used in notifications from a raw Copart lot"""
+    return {
+        "lot_id": lot_id,
+        "lot_url": lot.get("ldu", ""),  # Lot detail URL slug
+        "year": lot.get("lcy"),  # Lot year
+        "make": lot.get("mkn"),  # Make name
+        "model": lot.get("lm"),  # Lot model
+        "description": lot.get("ld"),  # Lot description
+        "damage": lot.get("dd"),  # Damage description
+        "odometer": lot.get("orr"),  # Odometer reading
+        "transmission": lot.get("tmtp"),  # Transmission type
+        "engine": lot.get("egn"),  # Engine
+        "fuel_type": lot.get("ft"),  # Fuel type
+        "sale_title": lot.get("ts"),  # Title status
+        "current_bid": lot.get("hb"),  # High bid
+        "auction_date": lot.get("ad"),  # Auction date
+        "location": lot.get("yn"),  # Yard name
+    }
+
+
+def extract_cars(data: Dict) -> Dict[int, CarDetails]:
     """Extract car details from Copart response
 
     Returns a dict mapping lot_id -> car_details
     """
-    cars = {}
-
-    # Handle Copart lots/search-results API response structure
-    if "data" in data and "results" in data["data"]:
-        results_data = data["data"]["results"]
-
-        # Check if it has content list
-        if "content" in results_data:
-            for lot in results_data["content"]:
-                # Use ln (lot number) as the lot ID
-                lot_id = str(lot.get("ln", ""))
-                if lot_id:
-                    cars[lot_id] = {
-                        "lot_id": lot_id,
-                        "lot_url": lot.get("ldu", ""),  # Lot detail URL slug
-                        "year": lot.get("lcy"),  # Lot year
-                        "make": lot.get("mkn"),  # Make name
-                        "model": lot.get("lm"),  # Lot model
-                        "description": lot.get("ld"),  # Lot description
-                        "damage": lot.get("dd"),  # Damage description
-                        "odometer": lot.get("orr"),  # Odometer reading
-                        "transmission": lot.get("tmtp"),  # Transmission type
-                        "engine": lot.get("egn"),  # Engine
-                        "fuel_type": lot.get("ft"),  # Fuel type
-                        "sale_title": lot.get("ts"),  # Title status
-                        "current_bid": lot.get("hb"),  # High bid
-                        "auction_date": lot.get("ad"),  # Auction date
-                        "location": lot.get("yn"),  # Yard name
-                    }
+    return {lot_id: extract_car_details(lot_id, lot) for lot_id, lot in extract_lot_index(data).items()}
 
-    return cars
 
-
-def extract_car_ids(data: Dict) -> Set[str]:
+def extract_car_ids(data: Dict) -> Set[int]:
     """Extract car/lot IDs from Copart response"""
-    cars = extract_cars(data)
-    return set(cars.keys())
+    return set(extract_lot_index(data))
 
 
-def format_car_notification(new_car_ids: Set[str], all_cars: Dict[str, Dict], total_count: int) -> List[str]:
-    """Format notification message for new cars
+def telegram_length(text: str) -> int:
+    """Length of text as Telegram counts it (UTF-16 code units, so emoji count twice)"""
+    return len(text.encode("utf-16-le")) // 2
 
-    Returns a list of messages (split if too long for Telegram's 4096 char limit)
-    """
-    messages = []
 
-    if len(new_car_ids) == 0:
-        return messages
+def format_car_info(lot_id: int, car: CarDetails) -> str:
+    """Format one car's block of a notification message"""
+    # Main details
+    year = car.get("year", "N/A")
+    make = car.get("make", "Unknown")
+    model = car.get("model", "Unknown")
+    parts = [f"\n📍 {year} {make} {model}\n"]
 
-    # Header
-    header = f"🚗 New Copart Alert!\n\n{len(new_car_ids)} new car(s) matching your criteria:\n"
-    header += f"\n{'='*40}\n"
+    # Additional details
+    damage = car.get("damage", "N/A")
+    if damage:
+        parts.append(f"   Damage: {damage}\n")
 
-    current_msg = header
-    car_count = 0
+    odometer = car.get("odometer")
+    if odometer:
+        parts.append(f"   Mileage: {odometer:,} miles\n")
 
-    # Sort car IDs by year (newest first), then by lot_id
-    def get_sort_key(lot_id):
-        car = all_cars.get(lot_id, {})
-        year = car.get("year", 0) or 0  # Handle None
-        return (-year, lot_id)  # Negative year for descending order
+    transmission = car.get("transmission", "")
+    if transmission:
+        parts.append(f"   Transmission: {transmission}\n")
 
-    for lot_id in sorted(new_car_ids, key=get_sort_key):
-        car = all_cars.get(lot_id, {})
+    current_bid = car.get("current_bid")
+    if current_bid:
+        parts.append(f"   Current Bid: £{current_bid:,}\n")
 
-        # Format car details
-        car_info = f"\n"
+    location = car.get("location", "")
+    if location:
+        parts.append(f"   Location: {location}\n")
 
-        # Main details
-        year = car.get("year", "N/A")
-        make = car.get("make", "Unknown")
-        model = car.get("model", "Unknown")
-        car_info += f"📍 {year} {make} {model}\n"
+    # Direct link using proper Copart URL format: /lot/{ln}/{ldu}
+    lot_url = car.get("lot_url", "")
+    if lot_url:
+        parts.append(_LOT_LINK(lot_id, lot_url))
+    else:
+        # Fallback to simple lot number URL
+        parts.append(_LOT_LINK_SHORT(lot_id))
+    parts.append(_DIVIDER)
+
+    return "".join(parts)
 
-        # Additional details
-        damage = car.get("damage", "N/A")
-        if damage:
-            car_info += f"   Damage: {damage}\n"
 
-        odometer = car.get("odometer")
-        if odometer:
-            car_info += f"   Mileage: {odometer:,} miles\n"
+def format_car_notification(new_car_ids: Set[int], all_cars: Dict[int, CarDetails], total_count: int) -> List[str]:
+    """Format notification message for new cars
+
+    all_cars must hold details for every ID in new_car_ids.
+    Returns a list of messages (split if too long for Telegram's 4096 char limit)
+    """
+    messages: List[str] = []
 
-        transmission = car.get("transmission", "")
-        if transmission:
-            car_info += f"   Transmission: {transmission}\n"
+    if len(new_car_ids) == 0:
+        return messages
 
-        current_bid = car.get("current_bid")
-        if current_bid:
-            car_info += f"   Current Bid: £{current_bid:,}\n"
+    # Build each message from a list of parts, tracking its length as we go
+    header = _NOTIFICATION_HEADER.format(count=len(new_car_ids))
+    current_parts = [header]
+    current_length = telegram_length(header)
 
-        location = car.get("location", "")
-        if location:
-            car_info += f"   Location: {location}\n"
+    # Look each car up once, then sort by year (newest first), then by lot_id
+    cars = [(lot_id, all_cars[lot_id]) for lot_id in new_car_ids]
+    cars.sort(key=lambda item: (-(item[1].get("year") or 0), item[0]))  # "or 0" handles None
 
-        # Direct link using proper Copart URL format: /lot/{ln}/{ldu}
-        lot_url = car.get("lot_url", "")
-        if lot_url:
-            car_info += f"   🔗 https://www.copart.co.uk/lot/{lot_id}/{lot_url}\n"
-        else:
-            # Fallback to simple lot number URL
-            car_info += f"   🔗 https://www.copart.co.uk/lot/{lot_id}\n"
-        car_info += f"\n{'='*40}\n"
+    for index, (lot_id, car) in enumerate(cars):
+        car_info = format_car_info(lot_id, car)
+        car_length = telegram_length(car_info)
 
-        # Check if adding this car would exceed Telegram's limit (4096 chars)
-        if len(current_msg + car_info) > 4000:
+        # Check if adding this car would exceed Telegram's limit
+        if current_length + car_length > TELEGRAM_MESSAGE_LIMIT:
             # Save current message and start a new one
-            messages.append(current_msg)
-            current_msg = f"🚗 Continued ({car_count + 1}/{len(new_car_ids)})...\n\n"
-            current_msg += car_info
-        else:
-            current_msg += car_info
+            messages.append("".join(current_parts))
+            continued = _NOTIFICATION_CONTINUED.format(index=index + 1, count=len(new_car_ids))
+            current_parts = [continued]
+            current_length = telegram_length(continued)
 
-        car_count += 1
+        current_parts.append(car_info)
+        current_length += car_length
 
     # Add footer to last message
-    footer = f"\nTotal listings: {total_count}\n"
-    footer += f"\n📋 Search Criteria:\n"
-    footer += f"• Has V5 (NOT Cat A or B)\n"
-    footer += f"• Year: 2020-2027\n"
-    footer += f"• Transmission: Automatic\n"
-    footer += f"• Mileage: 0-80,000 miles\n"
-    footer += f"• Damage: Minor or None\n"
-
-    if len(current_msg + footer) > 4000:
-        messages.append(current_msg)
+    footer = _NOTIFICATION_FOOTER.format(total=total_count)
+
+    if current_length + telegram_length(footer) > TELEGRAM_MESSAGE_LIMIT:
+        messages.append("".join(current_parts))
         messages.append(footer)
     else:
-        current_msg += footer
-        messages.append(current_msg)
+        current_parts.append(footer)
+        messages.append("".join(current_parts))
 
     return messages
 
@@ -327,61 +693,133 @@ def main():
     print("COPART CAR CHECKER (CATEGORY U)")
     print("="*60)
 
-    # Load previously seen cars (for duplicate prevention)
-    seen_cars = load_seen_cars()
-    print(f"Previously seen cars: {len(seen_cars)}")
+    # Open the Telegram connection in the background while Copart is fetched, so a
+    # notification does not pay for DNS and TLS setup after the search returns
+    threading.Thread(target=warm_up_telegram, daemon=True).start()
 
     # Fetch current listings from Copart API
     data = fetch_copart_cars()
-    all_cars = extract_cars(data)
-    current_cars = set(all_cars.keys())
+
+    if data.get("not_modified"):
+        print("\nℹ Copart results not modified (no duplicates sent)")
+        print("="*60)
+        # The listing is unchanged rather than empty and was not re-parsed, so no
+        # seen counts are reported
+        return {
+            "ok": True,
+            "new_cars_count": 0,
+            "total_count": data["data"]["results"]["totalElements"]
+        }
+
+    if data.get("error"):
+        print(f"\n⚠ Copart fetch failed ({data['error']}), skipping this check")
+        print("="*60)
+        return {
+            "ok": False,
+            "error": data["error"],
+            "new_cars_count": 0,
+            "total_count": 0,
+            "currently_seen": 0
+        }
+
+    # Only index the raw lots here; details are built for new cars alone below
+    lot_index = extract_lot_index(data)
+    current_cars = set(lot_index)
 
     # Get total count from response
-    total_count = 0
-    if "data" in data and "results" in data["data"]:
-        total_count = data["data"]["results"].get("totalElements", len(current_cars))
-    else:
-        total_count = data.get("total", len(current_cars))
+    total_count = data.get("data", {}).get("results", {}).get("totalElements", len(current_cars))
 
     print(f"Current cars found: {len(current_cars)}")
     print(f"Total count: {total_count}")
 
     # Detect NEW cars only (current cars that we haven't seen before)
     # This prevents sending duplicate notifications
-    new_cars = current_cars - seen_cars
+    new_cars, seen_count = find_new_cars(current_cars)
+    print(f"Previously seen cars: {seen_count}")
 
-    if new_cars:
-        print(f"\n🎉 Found {len(new_cars)} new car(s)!")
-        print(f"New car IDs: {sorted(new_cars)}")
+    result = {
+        "ok": True,
+        "new_cars_count": len(new_cars),
+        "total_count": total_count,
+        "previously_seen": seen_count,
+        "currently_seen": len(current_cars)
+    }
 
-        # Send notification(s) ONLY for new cars (sorted by year, newest first)
-        try:
-            messages = format_car_notification(new_cars, all_cars, total_count)
-            for i, message in enumerate(messages):
-                print(f"\nSending notification {i+1}/{len(messages)}...")
-                notify(message)
-        except Exception as e:
-            print(f"Failed to send notification: {e}")
-    else:
+    if not new_cars:
+        # Common case: nothing to format, send or append; the state may still need compacting
         print("\nℹ No new cars found (no duplicates sent)")
+        if current_cars and compact_seen_cars(seen_count, current_cars):
+            print(f"\n✓ State compacted to {len(current_cars)} car(s)")
+        remember_fetch(data)
+        print("="*60)
+        return result
+
+    print(f"\n🎉 Found {len(new_cars)} new car(s)!")
+    print(f"New car IDs: {sorted(new_cars)}")
+
+    # Send notification(s) ONLY for new cars (sorted by year, newest first)
+    try:
+        all_cars = {lot_id: extract_car_details(lot_id, lot_index[lot_id]) for lot_id in new_cars}
+        messages = format_car_notification(new_cars, all_cars, total_count)
+        for i, message in enumerate(messages):
+            print(f"\nSending notification {i+1}/{len(messages)}...")
+            notify(message)
+    except Exception as e:
+        print(f"Failed to send notification: {e}")
 
-    # Save all current cars to state file
+    # Append only the new cars to the state file
     # Next time we run, these will be "seen" and won't trigger notifications
-    if current_cars:
-        save_seen_cars(current_cars)
-        print(f"\n✓ State updated with {len(current_cars)} car(s)")
+    append_seen_cars(new_cars)
+    if compact_seen_cars(seen_count + len(new_cars), current_cars):
+        print(f"\n✓ State compacted to {len(current_cars)} car(s)")
+    else:
+        print(f"\n✓ State updated with {len(new_cars)} new car(s)")
+    remember_fetch(data)
 
     print("="*60)
 
-    return {
-        "ok": True,
-        "new_cars_count": len(new_cars),
-        "total_count": total_count,
-        "previously_seen": len(seen_cars),
-        "currently_seen": len(current_cars)
-    }
+    return result
+
+
+def next_delay(interval: int, failures: int) -> float:
+    """Seconds to wait before the next check
+
+    Backs off exponentially with jitter after consecutive failed checks, so a
+    rate-limited or failing Copart API is not polled at the normal interval.
+    """
+    if failures == 0:
+        return interval
+    delay = min(interval * 2 ** failures, MAX_BACKOFF)
+    return max(interval, delay * random.uniform(0.5, 1.0))
+
+
+def run_forever(interval: int):
+    """Run main() every `interval` seconds in one process
+
+    Keeps SESSION and the in-memory response cache between checks instead of paying
+    interpreter start-up each time; pooled connections are reused if still open.
+    """
+    if interval <= 0:
+        raise ValueError(f"CHECK_INTERVAL must be a positive number of seconds, got {interval}")
+
+    failures = 0
+    while True:
+        try:
+            result = main()
+            print(f"\nResult: {json.dumps(result, indent=2)}")
+            failures = 0 if result["ok"] else failures + 1
+        except Exception as e:
+            print(f"Check failed: {e}")
+            if DEBUG:
+                traceback.print_exc()
+            failures += 1
+        time.sleep(next_delay(interval, failures))
 
 
 if __name__ == "__main__":
-    result = main()
-    print(f"\nResult: {json.dumps(result, indent=2)}")
+    interval = os.environ.get("CHECK_INTERVAL")
+    if interval:
+        run_forever(int(interval))
+    else:
+        result = main()
+        print(f"\nResult: {json.dumps(result, indent=2)}")